@@ -16,11 +16,12 @@ def get_database_url() -> str:
     )
 
     if url.startswith("postgres://"):
-        url = url.replace("postgres://", "postgresql+psycopg2://", 1)
+        url = url.replace("postgres://", "postgresql+psycopg://", 1)
 
-    # Garante o prefixo do SQLAlchemy
-    if not url.startswith("postgresql+psycopg2://"):
-        url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    # Garante o prefixo do SQLAlchemy (driver psycopg 3)
+    if not url.startswith("postgresql+psycopg://"):
+        url = url.replace("postgresql+psycopg2://", "postgresql+psycopg://", 1)
+        url = url.replace("postgresql://", "postgresql+psycopg://", 1)
 
     return url
 
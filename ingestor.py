@@ -1,11 +1,29 @@
 # ingestor.py
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+import hashlib
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Callable, NamedTuple
 import pandas as pd
-
-from sqlalchemy.orm import Session
-
-from database import engine, SessionLocal
-from models import VotoSecao, ResumoMunZona, ImportLog
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+
+from database import engine, get_database_url
+from models import (
+    VotoSecao,
+    VotoZona,
+    ResumoMunZona,
+    ImportLog,
+    ArquivoImportado,
+    MarcadorCarga,
+)
 
 # Diretório de dados (volume Railway)
 DATA_DIR = "/app/dados_tse_volume"
@@ -13,171 +31,708 @@ Path(DATA_DIR).mkdir(parents=True, exist_ok=True)
 
 SEP = ";"
 ENCODING = "latin1"
+# Tamanho do bloco lido por vez (~150k linhas de VOTACAO_SECAO)
+CSV_BLOCK_SIZE = 64 << 20
+
+# Engine só da ingestão: sem pool (cada arquivo abre e fecha sua conexão,
+# sem prender slots do Postgres) e com synchronous_commit=off, já que os
+# CSVs podem ser reingeridos se um commit se perder num crash.
+ingest_engine = create_engine(
+    get_database_url(),
+    poolclass=NullPool,
+    connect_args={"options": "-c synchronous_commit=off"},
+)
+
+# Os índices de uma tabela só são removidos/recriados em volta da carga se
+# ela estiver vazia ou se os CSVs pendentes somarem pelo menos esta fração
+# do tamanho atual da tabela; cargas pequenas vão com os índices no lugar
+# (e as consultas da API continuam com índice durante o reload)
+REBUILD_INDICES_FRACAO = float(os.getenv("REBUILD_INDICES_FRACAO", "0.25"))
+
+# Memória de ordenação para o CREATE INDEX pós-carga (padrão do Postgres: 64MB)
+INDEX_MAINTENANCE_WORK_MEM = os.getenv("INDEX_MAINTENANCE_WORK_MEM", "256MB")
+
+
+def _cpus_disponiveis() -> int:
+    """CPUs que este processo pode usar (afinidade/cpuset), não as do host."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Processos usados pelo ingest_all. Cada um abre sua própria conexão e
+# segura alguns blocos de CSV_BLOCK_SIZE (+ DataFrames e o texto do COPY),
+# então o padrão é limitado a poucos processos mesmo em hosts grandes
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", min(4, _cpus_disponiveis())))
+
+# Os workers saem de um forkserver, não de um fork do uvicorn: o processo
+# da API tem threads de request que podem estar segurando locks (logging,
+# pool de conexões) no momento do fork
+INGEST_MP_CONTEXT = multiprocessing.get_context("forkserver")
+
+# Colunas da tabela -> colunas do CSV do TSE
+COLUNAS_SECAO = {
+    "ano": "ANO_ELEICAO",
+    "nr_turno": "NR_TURNO",
+    "uf": "SG_UF",
+    "cd_municipio": "CD_MUNICIPIO",
+    "nm_municipio": "NM_MUNICIPIO",
+    "nr_zona": "NR_ZONA",
+    "nr_secao": "NR_SECAO",
+    "nr_local_votacao": "NR_LOCAL_VOTACAO",
+    "nm_local_votacao": "NM_LOCAL_VOTACAO",
+    "endereco_local": "DS_LOCAL_VOTACAO_ENDERECO",
+    "cd_cargo": "CD_CARGO",
+    "ds_cargo": "DS_CARGO",
+    "nr_votavel": "NR_VOTAVEL",
+    "nm_votavel": "NM_VOTAVEL",
+    "nr_partido": "NR_PARTIDO",
+    "sg_partido": "SG_PARTIDO",
+    "qt_votos": "QT_VOTOS",
+}
+
+COLUNAS_MUNZONA = {
+    "ano": "ANO_ELEICAO",
+    "nr_turno": "NR_TURNO",
+    "uf": "SG_UF",
+    "cd_municipio": "CD_MUNICIPIO",
+    "nm_municipio": "NM_MUNICIPIO",
+    "nr_zona": "NR_ZONA",
+    "cd_cargo": "CD_CARGO",
+    "ds_cargo": "DS_CARGO",
+}
+
+# Colunas numéricas do MUNZONA (ausentes no CSV -> 0)
+NUMERICAS_MUNZONA = {
+    "qt_aptos": "QT_APTOS",
+    "qt_total_secoes": "QT_SECOES",
+    "qt_comparecimento": "QT_COMPARECIMENTO",
+    "qt_abstencoes": "QT_ABSTENCOES",
+    "qt_votos": "QT_VOTOS",
+    "qt_votos_nominais_validos": "QT_VOTOS_NOMINAIS_VALIDOS",
+    "qt_votos_brancos": "QT_VOTOS_BRANCOS",
+    "qt_total_votos_nulos": "QT_VOTOS_NULOS",
+    "qt_total_votos_leg_validos": "QT_VOTOS_LEGENDA",
+    "qt_votos_leg_validos": "QT_VOTOS_ANULADOS_APTOS",
+}
+
+# Colunas com poucos valores distintos: lidas como dicionário (categorical
+# no pandas), um código int32 por célula em vez de uma string por célula.
+# As colunas de ORDEM_SECAO (ANO_ELEICAO, SG_UF, CD_MUNICIPIO) ficam de
+# fora: categoricals ordenam pelo código do dicionário (ordem de aparição
+# no bloco), não pelo valor, o que quebraria o sort_values dos chunks
+COLUNAS_CATEGORICAS = frozenset({
+    "NR_TURNO",
+    "NM_MUNICIPIO",
+    "CD_CARGO",
+    "DS_CARGO",
+    "NR_PARTIDO",
+    "SG_PARTIDO",
+})
+
+# Prefixo comum dos índices de votos_secao: cada chunk é gravado nesta
+# ordem, então as linhas de uma mesma zona/seção ficam em páginas vizinhas
+ORDEM_SECAO = ["ano", "uf", "cd_municipio", "nr_zona", "nr_secao"]
+
+# Chave de agregação de votos_zona (todas as colunas que os endpoints
+# filtram/agrupam); qt_votos é somado
+CHAVE_ZONA = [
+    "ano",
+    "uf",
+    "cd_municipio",
+    "nm_municipio",
+    "nr_zona",
+    "cd_cargo",
+    "ds_cargo",
+    "nr_votavel",
+    "nm_votavel",
+    "sg_partido",
+]
+
+# Colunas do CSV efetivamente lidas (as demais o parser nem materializa)
+USECOLS_SECAO = frozenset(COLUNAS_SECAO.values())
+USECOLS_MUNZONA = frozenset(COLUNAS_MUNZONA.values()) | frozenset(NUMERICAS_MUNZONA.values())
 
 
 def init_db():
-    """Cria tabelas se ainda não existirem (exceto candidatos_meta, que já existe)."""
+    """
+    Cria tabelas se ainda não existirem (exceto candidatos_meta, que já existe).
+    Cargas pesadas ficam fora daqui: índices no ingest_all e a montagem de
+    votos_zona (preencher_votos_zona) numa thread do startup da API.
+    """
     from database import Base
     Base.metadata.create_all(bind=engine)
 
 
-def _insert_log(session: Session, tipo: str, nome_arquivo: str, linhas: int):
-    log = ImportLog(
-        tipo_arquivo=tipo,
-        nome_arquivo=nome_arquivo,
-        linhas_importadas=linhas,
+def _registro_arquivo(csv_path: Path, tipo: str, linhas: int, sha256: str) -> dict:
+    """Linha de arquivos_importados para o arquivo (com caminho/tamanho/mtime)."""
+    st = csv_path.stat()
+    return {
+        "nome_arquivo": csv_path.name,
+        "sha256": sha256,
+        "tipo_arquivo": tipo,
+        "linhas_importadas": linhas,
+        "caminho": os.fspath(csv_path),
+        "tamanho": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def _insert_log(conn: Connection, tipo: str, csv_path: Path, linhas: int, sha256: str):
+    conn.execute(
+        ImportLog.__table__.insert().values(
+            tipo_arquivo=tipo,
+            nome_arquivo=csv_path.name,
+            linhas_importadas=linhas,
+        )
+    )
+    conn.execute(
+        ArquivoImportado.__table__.insert().values(**_registro_arquivo(csv_path, tipo, linhas, sha256))
     )
-    session.add(log)
-    session.commit()
 
 
-def ingest_votacao_secao(csv_path: Path) -> int:
+def _sha256(csv_path: Path) -> str:
+    """Hash do conteúdo do arquivo, lido em blocos de 1MB."""
+    h = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _arquivos_conhecidos() -> set:
+    """(caminho, tamanho, mtime_ns) de todos os arquivos já registrados."""
+    t = ArquivoImportado.__table__
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(t.c.caminho, t.c.tamanho, t.c.mtime_ns).where(t.c.caminho.isnot(None))
+        )
+        return {tuple(r) for r in rows}
+
+
+def _hashes_importados(hashes) -> set:
+    """Quais dos `hashes` já constam em arquivos_importados."""
+    t = ArquivoImportado.__table__
+    with engine.connect() as conn:
+        rows = conn.execute(select(t.c.sha256).where(t.c.sha256.in_(set(hashes))))
+        return {r[0] for r in rows}
+
+
+def _copy_dataframe(cur, tabela: str, df: pd.DataFrame):
     """
-    Ingere arquivo VOTACAO_SECAO_* para a tabela votos_secao.
-    Usa pandas + to_sql em chunks para lidar com arquivos grandes.
+    Grava o DataFrame em `tabela` via COPY ... FROM STDIN (formato CSV),
+    que o Postgres carrega sem passar pelo parser/planner de INSERT.
+    NaN vira campo vazio sem aspas, que o COPY lê como NULL.
     """
-    csv_path = Path(csv_path)
-    total_linhas = 0
+    colunas = ", ".join(df.columns)
+    with cur.copy(f"COPY {tabela} ({colunas}) FROM STDIN WITH (FORMAT csv)") as copy:
+        copy.write(df.to_csv(header=False, index=False))
 
-    chunks = pd.read_csv(
-        csv_path,
-        sep=SEP,
-        encoding=ENCODING,
-        dtype=str,
-        chunksize=200_000,
-        low_memory=False,
-    )
 
-    for chunk in chunks:
-        # Normaliza nomes de colunas (upper)
-        chunk.columns = [c.strip().upper() for c in chunk.columns]
-
-        # Mapeia colunas do CSV -> colunas da tabela
-        df = pd.DataFrame({
-            "ano": chunk.get("ANO_ELEICAO"),
-            "nr_turno": chunk.get("NR_TURNO"),
-            "uf": chunk.get("SG_UF"),
-            "cd_municipio": chunk.get("CD_MUNICIPIO"),
-            "nm_municipio": chunk.get("NM_MUNICIPIO"),
-            "nr_zona": chunk.get("NR_ZONA"),
-            "nr_secao": chunk.get("NR_SECAO"),
-            "nr_local_votacao": chunk.get("NR_LOCAL_VOTACAO"),
-            "nm_local_votacao": chunk.get("NM_LOCAL_VOTACAO"),
-            "endereco_local": chunk.get("DS_LOCAL_VOTACAO_ENDERECO"),
-            "cd_cargo": chunk.get("CD_CARGO"),
-            "ds_cargo": chunk.get("DS_CARGO"),
-            "nr_votavel": chunk.get("NR_VOTAVEL"),
-            "nm_votavel": chunk.get("NM_VOTAVEL"),
-            "nr_partido": chunk.get("NR_PARTIDO"),
-            "sg_partido": chunk.get("SG_PARTIDO"),
-            "qt_votos": chunk.get("QT_VOTOS"),
-        })
-
-        # Converte qt_votos pra numérico (NaN -> 0)
-        df["qt_votos"] = pd.to_numeric(df["qt_votos"], errors="coerce").fillna(0).astype("int64")
-
-        df.to_sql(
-            VotoSecao.__tablename__,
-            con=engine,
-            if_exists="append",
-            index=False,
-            method="multi",
-            chunksize=10_000,
-        )
+def _ler_cabecalho(csv_path: Path) -> list:
+    """Lê só o cabeçalho do CSV, com os nomes já normalizados (strip + upper)."""
+    header = pd.read_csv(csv_path, sep=SEP, encoding=ENCODING, nrows=0).columns
+    return [c.strip().upper() for c in header]
 
-        total_linhas += len(df)
 
-    # Log
-    with SessionLocal() as session:
-        _insert_log(session, "secao", csv_path.name, total_linhas)
+def _ler_csv_em_chunks(csv_path: Path, cabecalho: list, usecols: frozenset):
+    """
+    Lê um CSV do TSE em blocos de CSV_BLOCK_SIZE bytes com o leitor de CSV
+    do Arrow, sem materializar o arquivo inteiro em memória. A tokenização e
+    a conversão rodam em C++ multi-thread; a transcodificação latin1 -> UTF-8
+    que vem antes é feita pelo codec incremental do Python (com o GIL).
+    Cada bloco sai como um DataFrame de strings (categorical em
+    COLUNAS_CATEGORICAS), já com as colunas do `cabecalho` normalizado.
+    Só as colunas em `usecols` são convertidas; as outras são descartadas
+    pelo parser.
+    """
+    colunas = [c for c in cabecalho if c in usecols]
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(
+            encoding=ENCODING,
+            block_size=CSV_BLOCK_SIZE,
+            column_names=cabecalho,
+            skip_rows=1,
+        ),
+        parse_options=pacsv.ParseOptions(delimiter=SEP),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=colunas,
+            column_types={
+                c: pa.dictionary(pa.int32(), pa.string()) if c in COLUNAS_CATEGORICAS else pa.string()
+                for c in colunas
+            },
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
 
-    return total_linhas
+
+def _em_segundo_plano(iterable, maxsize: int = 2):
+    """
+    Consome `iterable` numa thread à parte e entrega os itens por uma fila
+    limitada: o parse do próximo chunk roda enquanto o atual vai pro COPY.
+    A sobreposição é parcial: o envio do COPY e a tokenização do Arrow
+    soltam o GIL, mas a transcodificação latin1 e o to_csv/projeção no
+    pandas disputam o GIL entre si. A fila limita a memória a
+    `maxsize` chunks prontos. Erros do produtor são relançados aqui.
+    """
+    fila = queue.Queue(maxsize=maxsize)
+    parar = threading.Event()
+    fim = object()
+
+    def enfileirar(item) -> bool:
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produzir():
+        try:
+            for item in iterable:
+                if not enfileirar(item):
+                    return
+        except BaseException as e:
+            enfileirar(e)
+            return
+        enfileirar(fim)
+
+    produtor = threading.Thread(target=produzir, daemon=True)
+    produtor.start()
+    try:
+        while True:
+            item = fila.get()
+            if item is fim:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        parar.set()
+        produtor.join()
+
+
+def _projetor_secao(cabecalho: list):
+    """Monta a projeção VOTACAO_SECAO -> votos_secao de um arquivo."""
+    origem = list(COLUNAS_SECAO.values())
+    destino = list(COLUNAS_SECAO.keys())
+
+    def projetar(chunk: pd.DataFrame) -> pd.DataFrame:
+        # Mapeia colunas do CSV -> colunas da tabela numa única seleção
+        # (colunas ausentes no CSV viram NaN)
+        df = chunk.reindex(columns=origem)
+        df.columns = destino
+
+        # Converte qt_votos pra numérico (NaN -> 0); votos de uma seção cabem em int32
+        df["qt_votos"] = pd.to_numeric(df["qt_votos"], errors="coerce").fillna(0).astype("int32")
+
+        return df.sort_values(ORDEM_SECAO, kind="stable", ignore_index=True)
+
+    return projetar
+
+
+def _agregar_zona(df: pd.DataFrame) -> pd.DataFrame:
+    """Soma os votos de um chunk de votos_secao por CHAVE_ZONA (-> votos_zona)."""
+    return (
+        df.groupby(CHAVE_ZONA, observed=True, dropna=False, sort=False)["qt_votos"]
+        .sum()
+        .reset_index()
+    )
 
 
-def ingest_detalhe_munzona(csv_path: Path) -> int:
+def _projetor_munzona(cabecalho: list):
     """
-    Ingere arquivo DETALHE_VOTACAO_MUNZONA_* para a tabela resumo_munzona.
+    Monta a projeção DETALHE_VOTACAO_MUNZONA -> resumo_munzona de um arquivo.
+    Quais colunas numéricas existem é decidido uma vez, pelo cabeçalho,
+    e não a cada chunk.
+    """
+    presentes = frozenset(cabecalho)
+    numericas = [col for col, orig in NUMERICAS_MUNZONA.items() if orig in presentes]
+    ausentes = [col for col, orig in NUMERICAS_MUNZONA.items() if orig not in presentes]
+
+    mapa = {**COLUNAS_MUNZONA, **{col: NUMERICAS_MUNZONA[col] for col in numericas}}
+    origem = list(mapa.values())
+    destino = list(mapa.keys())
+
+    def projetar(chunk: pd.DataFrame) -> pd.DataFrame:
+        df = chunk.reindex(columns=origem)
+        df.columns = destino
+        # Uma única passada sobre o bloco numérico; int32 basta para as
+        # contagens de um município/zona e ocupa metade da memória
+        if numericas:
+            df[numericas] = (
+                df[numericas].apply(pd.to_numeric, errors="coerce").fillna(0).astype("int32")
+            )
+        for col in ausentes:
+            df[col] = 0
+
+        return df
+
+    return projetar
+
+
+def _ingerir_csv(
+    csv_path: Path,
+    tabela: str,
+    usecols: frozenset,
+    criar_projetor,
+    tipo: str,
+    sha256: str = None,
+    agregacoes: tuple = (),
+) -> int:
+    """
+    Lê o CSV em chunks, projeta cada um e grava em `tabela`.
+    `criar_projetor(cabecalho)` devolve a função de projeção do arquivo.
+    Cada (tabela_agregada, agregar) em `agregacoes` grava também
+    agregar(df) de cada chunk em tabela_agregada.
+    Dados + log vão numa única transação por arquivo: um único commit
+    (e um único fsync no Postgres) em vez de um por chunk, e um arquivo
+    que falhe no meio não deixa linhas parciais para trás.
+    O hash do conteúdo é registrado em arquivos_importados na mesma transação.
     """
     csv_path = Path(csv_path)
     total_linhas = 0
+    sha256 = sha256 or _sha256(csv_path)
+
+    cabecalho = _ler_cabecalho(csv_path)
+    projetar = criar_projetor(cabecalho)
 
-    chunks = pd.read_csv(
+    with ingest_engine.begin() as conn:
+        # Um único cursor da conexão DBAPI para todos os chunks do arquivo
+        with conn.connection.cursor() as cur:
+            chunks = _ler_csv_em_chunks(csv_path, cabecalho, usecols)
+            for chunk in _em_segundo_plano(chunks):
+                df = projetar(chunk)
+                _copy_dataframe(cur, tabela, df)
+                for tabela_agregada, agregar in agregacoes:
+                    _copy_dataframe(cur, tabela_agregada, agregar(df))
+                total_linhas += len(df)
+
+        # Log
+        _insert_log(conn, tipo, csv_path, total_linhas, sha256)
+
+    return total_linhas
+
+
+def ingest_votacao_secao(csv_path: Path, sha256: str = None) -> int:
+    """
+    Ingere arquivo VOTACAO_SECAO_* para a tabela votos_secao (e os totais
+    por zona em votos_zona).
+    Lê em blocos com o leitor de CSV do Arrow e grava via COPY para lidar
+    com arquivos grandes.
+    Garante antes que votos_zona já tem o histórico de votos_secao
+    (preencher_votos_zona), senão os totais novos ficariam sozinhos nela.
+    """
+    preencher_votos_zona()
+    return _ingerir_csv(
         csv_path,
-        sep=SEP,
-        encoding=ENCODING,
-        dtype=str,
-        chunksize=200_000,
-        low_memory=False,
+        VotoSecao.__tablename__,
+        USECOLS_SECAO,
+        _projetor_secao,
+        "secao",
+        sha256,
+        agregacoes=((VotoZona.__tablename__, _agregar_zona),),
+    )
+
+
+def ingest_detalhe_munzona(csv_path: Path, sha256: str = None) -> int:
+    """
+    Ingere arquivo DETALHE_VOTACAO_MUNZONA_* para a tabela resumo_munzona.
+    """
+    return _ingerir_csv(
+        csv_path, ResumoMunZona.__tablename__, USECOLS_MUNZONA, _projetor_munzona, "munzona", sha256
     )
 
-    for chunk in chunks:
-        chunk.columns = [c.strip().upper() for c in chunk.columns]
-
-        def num(colname: str):
-            return pd.to_numeric(chunk.get(colname), errors="coerce").fillna(0).astype("int64")
-
-        df = pd.DataFrame({
-            "ano": chunk.get("ANO_ELEICAO"),
-            "nr_turno": chunk.get("NR_TURNO"),
-            "uf": chunk.get("SG_UF"),
-            "cd_municipio": chunk.get("CD_MUNICIPIO"),
-            "nm_municipio": chunk.get("NM_MUNICIPIO"),
-            "nr_zona": chunk.get("NR_ZONA"),
-            "cd_cargo": chunk.get("CD_CARGO"),
-            "ds_cargo": chunk.get("DS_CARGO"),
-            "qt_aptos": num("QT_APTOS") if "QT_APTOS" in chunk.columns else 0,
-            "qt_total_secoes": num("QT_SECOES") if "QT_SECOES" in chunk.columns else 0,
-            "qt_comparecimento": num("QT_COMPARECIMENTO") if "QT_COMPARECIMENTO" in chunk.columns else 0,
-            "qt_abstencoes": num("QT_ABSTENCOES") if "QT_ABSTENCOES" in chunk.columns else 0,
-            "qt_votos": num("QT_VOTOS") if "QT_VOTOS" in chunk.columns else 0,
-            "qt_votos_nominais_validos": num("QT_VOTOS_NOMINAIS_VALIDOS") if "QT_VOTOS_NOMINAIS_VALIDOS" in chunk.columns else 0,
-            "qt_votos_brancos": num("QT_VOTOS_BRANCOS") if "QT_VOTOS_BRANCOS" in chunk.columns else 0,
-            "qt_total_votos_nulos": num("QT_VOTOS_NULOS") if "QT_VOTOS_NULOS" in chunk.columns else 0,
-            "qt_total_votos_leg_validos": num("QT_VOTOS_LEGENDA") if "QT_VOTOS_LEGENDA" in chunk.columns else 0,
-            "qt_votos_leg_validos": num("QT_VOTOS_ANULADOS_APTOS") if "QT_VOTOS_ANULADOS_APTOS" in chunk.columns else 0,
-        })
-
-        df.to_sql(
-            ResumoMunZona.__tablename__,
-            con=engine,
-            if_exists="append",
-            index=False,
-            method="multi",
-            chunksize=10_000,
+
+# Tabelas recarregadas em massa pelo ingest_all
+TABELAS_BULK = (VotoSecao.__table__, VotoZona.__table__, ResumoMunZona.__table__)
+
+
+def drop_indices(tabelas=TABELAS_BULK):
+    """Remove os índices (exceto PK) das `tabelas` de carga em massa."""
+    with ingest_engine.begin() as conn:
+        for table in tabelas:
+            for idx in table.indexes:
+                idx.drop(bind=conn, checkfirst=True)
+
+
+def create_indices(tabelas=TABELAS_BULK):
+    """
+    Recria os índices definidos em models.py que estiverem faltando nas `tabelas`.
+    Sobe o maintenance_work_mem só nesta transação para que o sort de cada
+    CREATE INDEX caiba em memória em vez de ir para arquivos temporários.
+    """
+    with ingest_engine.begin() as conn:
+        conn.execute(
+            text("SELECT set_config('maintenance_work_mem', :valor, true)"),
+            {"valor": INDEX_MAINTENANCE_WORK_MEM},
         )
+        for table in tabelas:
+            for idx in table.indexes:
+                idx.create(bind=conn, checkfirst=True)
 
-        total_linhas += len(df)
 
-    with SessionLocal() as session:
-        _insert_log(session, "munzona", csv_path.name, total_linhas)
+# Marcador (em marcadores_carga) de votos_zona já montada a partir de votos_secao
+MARCADOR_VOTOS_ZONA = "votos_zona"
+# Chave do advisory lock que serializa essa montagem entre processos
+LOCK_VOTOS_ZONA = 1
 
-    return total_linhas
+
+def votos_zona_preenchida(conn: Connection) -> bool:
+    """Se votos_zona já foi montada a partir de votos_secao (marcador gravado)."""
+    t = MarcadorCarga.__table__
+    return conn.execute(
+        select(t.c.nome).where(t.c.nome == MARCADOR_VOTOS_ZONA)
+    ).first() is not None
+
+
+def preencher_votos_zona() -> bool:
+    """
+    Monta votos_zona a partir de todo o votos_secao, uma vez por base
+    (marcador MARCADOR_VOTOS_ZONA, gravado na mesma transação). Roda antes
+    de qualquer ingestão de SECAO (ingest_votacao_secao chama no início) e,
+    em segundo plano, no startup da API. Com o marcador já gravado é só um
+    SELECT; devolve se montou.
+
+    A montagem roda sob um advisory lock, para que startup, uploads e
+    workers não a façam duas vezes. votos_zona é esvaziada antes (pode ter
+    só os totais de uploads anteriores) e o GROUP BY vai sem os índices,
+    recriados no final. O TRUNCATE segura a tabela até o commit, então as
+    consultas da API esperam e já leem votos_zona completa.
+    """
+    with ingest_engine.connect() as conn:
+        if votos_zona_preenchida(conn):
+            return False
+
+    zona, secao = VotoZona.__tablename__, VotoSecao.__tablename__
+    chave = ", ".join(CHAVE_ZONA)
+    with ingest_engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:chave)"), {"chave": LOCK_VOTOS_ZONA})
+        if votos_zona_preenchida(conn):
+            return False
+
+        conn.execute(text(f"TRUNCATE TABLE {zona}"))
+        for idx in VotoZona.__table__.indexes:
+            idx.drop(bind=conn, checkfirst=True)
+        conn.execute(
+            text(
+                f"INSERT INTO {zona} ({chave}, qt_votos) "
+                f"SELECT {chave}, SUM(qt_votos) FROM {secao} "
+                f"GROUP BY {chave}"
+            )
+        )
+        conn.execute(
+            text("SELECT set_config('maintenance_work_mem', :valor, true)"),
+            {"valor": INDEX_MAINTENANCE_WORK_MEM},
+        )
+        for idx in VotoZona.__table__.indexes:
+            idx.create(bind=conn, checkfirst=True)
+        conn.execute(MarcadorCarga.__table__.insert().values(nome=MARCADOR_VOTOS_ZONA))
+    analyze_tabelas((VotoZona.__table__,))
+    return True
+
+
+def analyze_tabelas(tabelas=TABELAS_BULK):
+    """
+    Atualiza as estatísticas do planner para as tabelas recarregadas.
+    Sem isso o autovacuum pode demorar a rodar e as consultas da API
+    pegam planos ruins logo após um reload.
+    """
+    with ingest_engine.begin() as conn:
+        for table in tabelas:
+            conn.execute(text(f"ANALYZE {table.name}"))
+
+
+def _listar_csvs(root) -> list:
+    """
+    Lista os .csv sob root (recursivo) com os.scandir: o DirEntry já traz o
+    tipo da entrada, sem um stat por arquivo nem fnmatch como no rglob.
+    """
+    paths = []
+    pendentes = [os.fspath(root)]
+    while pendentes:
+        with os.scandir(pendentes.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    pendentes.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(".csv"):
+                    paths.append(Path(entry.path))
+    return sorted(paths)
+
+
+class EntradaIngest(NamedTuple):
+    """Como ingerir um CSV cujo nome contém `padrao` (e que tabelas ele grava)."""
+    padrao: str
+    ingest: Callable[..., int]
+    tipo: str  # 'secao' ou 'munzona'
+    tabelas: tuple
+
+
+# O primeiro padrão que casar vence; a primeira tabela é a que decide se
+# vale remover/recriar os índices do grupo (ver _tabelas_para_rebuild)
+INGEST_POR_NOME = (
+    EntradaIngest(
+        "SECAO", ingest_votacao_secao, "secao", (VotoSecao.__table__, VotoZona.__table__)
+    ),
+    EntradaIngest("MUNZONA", ingest_detalhe_munzona, "munzona", (ResumoMunZona.__table__,)),
+)
+
+
+def _entrada_do_arquivo(csv_path: Path):
+    """Entrada de INGEST_POR_NOME para o arquivo, pelo nome (None se não reconhecido)."""
+    name_upper = csv_path.name.upper()
+    for entrada in INGEST_POR_NOME:
+        if entrada.padrao in name_upper:
+            return entrada
+    return None
+
+
+def ingest_arquivo(csv_path: Path, sha256: str = None) -> int:
+    """
+    Ingere um CSV escolhendo a tabela pelo nome do arquivo (INGEST_POR_NOME).
+    Arquivos não reconhecidos são ignorados (0 linhas).
+    """
+    entrada = _entrada_do_arquivo(csv_path)
+    if entrada is None:
+        return 0
+    return entrada.ingest(csv_path, sha256)
+
+
+def _registrar_repetidos(repetidos):
+    """
+    Registra arquivos cujo conteúdo já foi importado (por outro caminho ou
+    antes de um touch), com linhas_importadas=0, para que o próximo reload
+    os pule pelo caminho/tamanho/mtime sem recalcular o hash.
+    Só deve ser chamada depois que o conteúdo foi de fato ingerido: o hash
+    registrado aqui também conta como importado (_hashes_importados).
+    """
+    if not repetidos:
+        return
+    registros = [_registro_arquivo(p, _entrada_do_arquivo(p).tipo, 0, h) for p, h in repetidos]
+    with engine.begin() as conn:
+        conn.execute(ArquivoImportado.__table__.insert(), registros)
+
+
+def _tabelas_para_rebuild(pendentes) -> list:
+    """
+    Tabelas cujos índices valem ser removidos antes da carga e recriados
+    depois: as dos grupos em que a tabela principal está vazia ou em que os
+    CSVs pendentes somam >= REBUILD_INDICES_FRACAO do tamanho dela.
+    Nas demais o COPY vai com os índices no lugar.
+    """
+    bytes_por_grupo = {}
+    for p, _ in pendentes:
+        tabelas = _entrada_do_arquivo(p).tabelas
+        bytes_por_grupo[tabelas] = bytes_por_grupo.get(tabelas, 0) + p.stat().st_size
+
+    with engine.connect() as conn:
+        tamanhos = {
+            tabelas: conn.execute(
+                text("SELECT pg_relation_size(CAST(:tabela AS regclass))"),
+                {"tabela": tabelas[0].name},
+            ).scalar()
+            for tabelas in bytes_por_grupo
+        }
+
+    return [
+        table
+        for tabelas, pendente in bytes_por_grupo.items()
+        if pendente >= REBUILD_INDICES_FRACAO * tamanhos[tabelas]
+        for table in tabelas
+    ]
 
 
 def ingest_all() -> int:
     """
-    Reingere TODOS os CSVs do diretório DATA_DIR.
-    Arquivos com 'SECAO' no nome -> votos_secao
+    Ingere os CSVs do diretório DATA_DIR que ainda não foram importados.
+    Arquivos com 'SECAO' no nome -> votos_secao (+ votos_zona)
     Arquivos com 'MUNZONA' no nome -> resumo_munzona
+
+    Arquivos com o mesmo caminho, tamanho e mtime de um já registrado em
+    arquivos_importados são pulados sem ler o conteúdo. Os demais têm o
+    sha256 calculado: conteúdo já importado (ou repetido dentro do mesmo
+    reload) não é ingerido de novo, só registrado.
+
+    Os arquivos são independentes, então o hash e o parse rodam em paralelo
+    em até INGEST_WORKERS processos (um arquivo por processo).
+
+    Só as tabelas que os arquivos pendentes gravam entram no reload. Se a
+    carga for grande em relação a elas (ver _tabelas_para_rebuild), os
+    índices são removidos antes e recriados no final: um build ordenado em
+    vez de manter cada B-tree linha a linha. Depois roda ANALYZE nelas.
+
+    Antes de tudo, monta votos_zona se a base ainda não a tiver
+    (preencher_votos_zona), antes de remover índices e abrir os processos.
     """
+    preencher_votos_zona()
+
     total = 0
-    root = Path(DATA_DIR)
-    for csv_path in root.rglob("*.csv"):
-        name_upper = csv_path.name.upper()
-        if "SECAO" in name_upper:
-            total += ingest_votacao_secao(csv_path)
-        elif "MUNZONA" in name_upper:
-            total += ingest_detalhe_munzona(csv_path)
+    conhecidos = _arquivos_conhecidos()
+    paths = []
+    for p in _listar_csvs(DATA_DIR):
+        if _entrada_do_arquivo(p) is None:
+            continue
+        st = p.stat()
+        if (os.fspath(p), st.st_size, st.st_mtime_ns) not in conhecidos:
+            paths.append(p)
+    if not paths:
+        return total
+
+    with ProcessPoolExecutor(max_workers=INGEST_WORKERS, mp_context=INGEST_MP_CONTEXT) as ex:
+        hashes = list(ex.map(_sha256, paths))
+        importados = _hashes_importados(hashes)
+        # Cópias de um arquivo pendente deste reload, por hash: só são
+        # registradas depois que o original for ingerido com sucesso
+        copias = {}
+        pendentes, repetidos = [], []
+        for p, h in zip(paths, hashes):
+            if h in importados:
+                repetidos.append((p, h))
+            elif h in copias:
+                copias[h].append(p)
+            else:
+                copias[h] = []
+                pendentes.append((p, h))
+
+        _registrar_repetidos(repetidos)
+        if not pendentes:
+            return total
+
+        tabelas = {t for p, _ in pendentes for t in _entrada_do_arquivo(p).tabelas}
+        rebuild = _tabelas_para_rebuild(pendentes)
+
+        drop_indices(rebuild)
+        try:
+            futures = {ex.submit(ingest_arquivo, p, h): h for p, h in pendentes}
+            try:
+                for future in as_completed(futures):
+                    total += future.result()
+                    h = futures[future]
+                    _registrar_repetidos([(p, h) for p in copias[h]])
+            except BaseException:
+                ex.shutdown(wait=True, cancel_futures=True)
+                raise
+        finally:
+            create_indices(rebuild)
+
+    analyze_tabelas([t for t in TABELAS_BULK if t in tabelas])
 
     return total
 
 
 def clear_all_data():
     """
-    Limpa as tabelas de votos_secao e resumo_munzona.
+    Limpa as tabelas de votos_secao, votos_zona e resumo_munzona (e o registro de
+    arquivos importados, para que um reload volte a ingeri-los).
     NÃO mexe em candidatos_meta.
+    TRUNCATE libera as páginas de uma vez, em vez de um DELETE que marca
+    cada linha como morta (e deixa tudo para o VACUUM).
     """
-    with SessionLocal() as session:
-        session.query(VotoSecao).delete()
-        session.query(ResumoMunZona).delete()
-        session.commit()
+    tabelas = ", ".join(t.name for t in (*TABELAS_BULK, ArquivoImportado.__table__))
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {tabelas}"))
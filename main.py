@@ -8,25 +8,34 @@ from fastapi import (
     Depends,
 )
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional, List
 from pathlib import Path
+from collections import OrderedDict
+from functools import wraps
+import errno
 import os
+import threading
+import time
 import zipfile
 import shutil
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import BigInteger, cast, func, and_, select, union
 
 from database import get_db
 from ingestor import (
     ingest_votacao_secao,
     ingest_detalhe_munzona,
+    ingest_arquivo,
     ingest_all,
+    preencher_votos_zona,
+    votos_zona_preenchida,
     clear_all_data,
     DATA_DIR,
     init_db,
 )
-from models import VotoSecao, ResumoMunZona, CandidatoMeta
+from models import VotoSecao, VotoZona, ResumoMunZona, CandidatoMeta
 from schemas import (
     VotoTotalOut,
     CandidatoOut,   # ✅ novo
@@ -64,14 +73,94 @@ app.add_middleware(
 UPLOAD_DIR = DATA_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Bloco da cópia de uploads para o volume (o padrão do copyfileobj é 64KB):
+# CSVs do TSE têm GBs, então menos syscalls/iterações por arquivo
+COPY_BUFFER = 4 * 1024 * 1024
+
+
+# =============================
+# CACHE DE RESPOSTAS
+# =============================
+
+# Os dados de votos só mudam via upload/reload/clear (que limpam o cache),
+# então respostas iguais são servidas da memória sem refazer o SUM/GROUP BY.
+# O TTL cobre mudanças feitas por fora da API (ex.: candidatos_meta).
+# O limite é pelo total de linhas guardadas, não por número de respostas:
+# /candidatos?cd_municipio=... não tem limit e pode devolver muitas linhas.
+CACHE_TTL = int(os.getenv("CACHE_TTL", "600"))
+CACHE_MAX_LINHAS = int(os.getenv("CACHE_MAX_LINHAS", "100000"))
+
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # chave -> (expira, resposta, linhas)
+_cache_linhas = 0
+# Incrementada a cada limpar_cache(): uma consulta que começou antes da
+# limpeza não grava o resultado (que pode ser de antes do commit)
+_cache_geracao = 0
+_cache_lock = threading.Lock()
+
+
+def cache_resposta(endpoint):
+    """
+    Guarda a resposta do endpoint por (nome, parâmetros de query) por até
+    CACHE_TTL segundos, descartando as menos usadas quando o total passa de
+    CACHE_MAX_LINHAS linhas. A sessão `db` fica fora da chave.
+    """
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        global _cache_linhas
+
+        chave = (endpoint.__name__, tuple(sorted((k, v) for k, v in kwargs.items() if k != "db")))
+        agora = time.monotonic()
+        with _cache_lock:
+            item = _cache.get(chave)
+            if item is not None and item[0] > agora:
+                _cache.move_to_end(chave)
+                return item[1]
+            geracao = _cache_geracao
+
+        resposta = endpoint(*args, **kwargs)
+        linhas = len(resposta) if isinstance(resposta, list) else 1
+
+        with _cache_lock:
+            if geracao != _cache_geracao or linhas > CACHE_MAX_LINHAS:
+                return resposta
+            antigo = _cache.pop(chave, None)
+            if antigo is not None:
+                _cache_linhas -= antigo[2]
+            _cache[chave] = (agora + CACHE_TTL, resposta, linhas)
+            _cache_linhas += linhas
+            while _cache_linhas > CACHE_MAX_LINHAS:
+                _, (_, _, removidas) = _cache.popitem(last=False)
+                _cache_linhas -= removidas
+        return resposta
+
+    return wrapper
+
+
+def limpar_cache():
+    global _cache_linhas, _cache_geracao
+
+    with _cache_lock:
+        _cache.clear()
+        _cache_linhas = 0
+        _cache_geracao += 1
+
 
 # =============================
 # STARTUP
 # =============================
 
+def _preencher_votos_zona():
+    """Montagem única de votos_zona (ver preencher_votos_zona); limpa o cache se montou."""
+    if preencher_votos_zona():
+        limpar_cache()
+
+
 @app.on_event("startup")
 def on_startup():
     init_db()
+    # Em bases com votos_secao antigo a montagem é um GROUP BY pesado:
+    # roda numa thread para não segurar o boot
+    threading.Thread(target=_preencher_votos_zona, daemon=True).start()
 
 
 # =============================
@@ -79,23 +168,32 @@ def on_startup():
 # =============================
 
 @app.get("/estatisticas", response_model=EstatisticasOut)
+@cache_resposta
 def estatisticas(db: Session = Depends(get_db)):
-    total_secao = db.query(func.count(VotoSecao.id)).scalar() or 0
-    total_mz = db.query(func.count(ResumoMunZona.id)).scalar() or 0
-
-    anos_vsec = db.query(VotoSecao.ano).distinct()
-    anos_mz = db.query(ResumoMunZona.ano).distinct()
-    anos_cmeta = db.query(CandidatoMeta.ano).distinct()
-
-    anos = sorted(
-        {a[0] for a in anos_vsec if a[0]}
-        | {a[0] for a in anos_mz if a[0]}
-        | {a[0] for a in anos_cmeta if a[0]}
-    )
+    # As duas contagens numa única ida ao banco
+    total_secao, total_mz = db.query(
+        select(func.count(VotoSecao.id)).scalar_subquery(),
+        select(func.count(ResumoMunZona.id)).scalar_subquery(),
+    ).one()
+
+    # Anos distintos das três tabelas num único UNION (que já deduplica).
+    # Com votos_zona já montada (marcador gravado junto) ela tem os mesmos
+    # anos de votos_secao com bem menos linhas; antes disso, lê votos_secao
+    ano_votos = VotoZona.ano if votos_zona_preenchida(db.connection()) else VotoSecao.ano
+    anos_q = union(
+        select(ano_votos),
+        select(ResumoMunZona.ano),
+        select(CandidatoMeta.ano),
+    ).subquery()
+    anos = [
+        a
+        for (a,) in db.query(anos_q.c.ano).filter(anos_q.c.ano.isnot(None)).order_by(anos_q.c.ano)
+        if a
+    ]
 
     return EstatisticasOut(
-        total_linhas_votos_secao=total_secao,
-        total_linhas_resumo_munzona=total_mz,
+        total_linhas_votos_secao=total_secao or 0,
+        total_linhas_resumo_munzona=total_mz or 0,
         anos_disponiveis=anos,
     )
 
@@ -104,7 +202,14 @@ def estatisticas(db: Session = Depends(get_db)):
 # VOTOS / AGREGAÇÕES
 # =============================
 
+# SUM(bigint) no Postgres devolve numeric (Decimal no Python); o cast
+# mantém total_votos como int, já no tipo do campo dos modelos de saída.
+# As linhas vêm do nosso próprio schema, então as respostas são montadas
+# com model_construct, sem revalidar campo a campo.
+TOTAL_VOTOS = cast(func.sum(VotoZona.qt_votos), BigInteger).label("total_votos")
+
 @app.get("/votos/totais", response_model=List[VotoTotalOut])
+@cache_resposta
 def votos_totais(
     ano: Optional[str] = Query(None),
     uf: Optional[str] = Query(None),
@@ -117,7 +222,7 @@ def votos_totais(
 ):
     """
     Votos agregados por candidato.
-    VOTOS = soma de votos_secao.qt_votos
+    VOTOS = soma de votos_zona.qt_votos (votos_secao já somado por zona)
     META = candidatos_meta
     """
     q = db.query(
@@ -125,19 +230,19 @@ def votos_totais(
         CandidatoMeta.uf,
         CandidatoMeta.cd_municipio,
         CandidatoMeta.nm_municipio,
-        VotoSecao.ds_cargo.label("ds_cargo"),
+        VotoZona.ds_cargo.label("ds_cargo"),
         CandidatoMeta.nr_candidato,
         CandidatoMeta.nm_candidato,
         CandidatoMeta.sg_partido,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        TOTAL_VOTOS,
     ).join(
-        VotoSecao,
+        VotoZona,
         and_(
-            VotoSecao.ano == CandidatoMeta.ano,
-            VotoSecao.uf == CandidatoMeta.uf,
-            VotoSecao.cd_municipio == CandidatoMeta.cd_municipio,
-            VotoSecao.cd_cargo == CandidatoMeta.cd_cargo,
-            VotoSecao.nr_votavel == CandidatoMeta.nr_candidato,
+            VotoZona.ano == CandidatoMeta.ano,
+            VotoZona.uf == CandidatoMeta.uf,
+            VotoZona.cd_municipio == CandidatoMeta.cd_municipio,
+            VotoZona.cd_cargo == CandidatoMeta.cd_cargo,
+            VotoZona.nr_votavel == CandidatoMeta.nr_candidato,
         ),
     )
 
@@ -148,7 +253,7 @@ def votos_totais(
     if cd_municipio:
         q = q.filter(CandidatoMeta.cd_municipio == cd_municipio)
     if ds_cargo:
-        q = q.filter(VotoSecao.ds_cargo == ds_cargo)
+        q = q.filter(VotoZona.ds_cargo == ds_cargo)
     if nr_candidato:
         q = q.filter(CandidatoMeta.nr_candidato == nr_candidato)
     if sg_partido:
@@ -159,16 +264,16 @@ def votos_totais(
         CandidatoMeta.uf,
         CandidatoMeta.cd_municipio,
         CandidatoMeta.nm_municipio,
-        VotoSecao.ds_cargo,
+        VotoZona.ds_cargo,
         CandidatoMeta.nr_candidato,
         CandidatoMeta.nm_candidato,
         CandidatoMeta.sg_partido,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc()).limit(limit)
+    ).order_by(func.sum(VotoZona.qt_votos).desc()).limit(limit)
 
     rows = q.all()
 
     return [
-        VotoTotalOut(
+        VotoTotalOut.model_construct(
             ano=r.ano,
             uf=r.uf,
             cd_municipio=r.cd_municipio,
@@ -184,6 +289,7 @@ def votos_totais(
 
 
 @app.get("/votos/zona", response_model=List[VotoZonaOut])
+@cache_resposta
 def votos_por_zona(
     ano: Optional[str] = Query(None),
     uf: Optional[str] = Query(None),
@@ -194,49 +300,49 @@ def votos_por_zona(
     db: Session = Depends(get_db),
 ):
     """
-    Votos por ZONA, a partir de votos_secao.
+    Votos por ZONA, a partir de votos_zona (votos_secao já somado por zona).
     Usado para mapa e detalhamento por zona.
     """
     q = db.query(
-        VotoSecao.ano.label("ano"),
-        VotoSecao.uf.label("uf"),
-        VotoSecao.cd_municipio,
-        VotoSecao.nm_municipio,
-        VotoSecao.nr_zona,
-        VotoSecao.ds_cargo,
-        VotoSecao.nr_votavel.label("nr_candidato"),
-        VotoSecao.nm_votavel.label("nm_candidato"),
-        VotoSecao.sg_partido,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        VotoZona.ano.label("ano"),
+        VotoZona.uf.label("uf"),
+        VotoZona.cd_municipio,
+        VotoZona.nm_municipio,
+        VotoZona.nr_zona,
+        VotoZona.ds_cargo,
+        VotoZona.nr_votavel.label("nr_candidato"),
+        VotoZona.nm_votavel.label("nm_candidato"),
+        VotoZona.sg_partido,
+        TOTAL_VOTOS,
     )
 
     if ano:
-        q = q.filter(VotoSecao.ano == ano)
+        q = q.filter(VotoZona.ano == ano)
     if uf:
-        q = q.filter(VotoSecao.uf == uf)
+        q = q.filter(VotoZona.uf == uf)
     if cd_municipio:
-        q = q.filter(VotoSecao.cd_municipio == cd_municipio)
+        q = q.filter(VotoZona.cd_municipio == cd_municipio)
     if nr_zona:
-        q = q.filter(VotoSecao.nr_zona == nr_zona)
+        q = q.filter(VotoZona.nr_zona == nr_zona)
     if ds_cargo:
-        q = q.filter(VotoSecao.ds_cargo == ds_cargo)
+        q = q.filter(VotoZona.ds_cargo == ds_cargo)
 
     q = q.group_by(
-        VotoSecao.ano,
-        VotoSecao.uf,
-        VotoSecao.cd_municipio,
-        VotoSecao.nm_municipio,
-        VotoSecao.nr_zona,
-        VotoSecao.ds_cargo,
-        VotoSecao.nr_votavel,
-        VotoSecao.nm_votavel,
-        VotoSecao.sg_partido,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc()).limit(limit)
+        VotoZona.ano,
+        VotoZona.uf,
+        VotoZona.cd_municipio,
+        VotoZona.nm_municipio,
+        VotoZona.nr_zona,
+        VotoZona.ds_cargo,
+        VotoZona.nr_votavel,
+        VotoZona.nm_votavel,
+        VotoZona.sg_partido,
+    ).order_by(func.sum(VotoZona.qt_votos).desc()).limit(limit)
 
     rows = q.all()
 
     return [
-        VotoZonaOut(
+        VotoZonaOut.model_construct(
             ano=r.ano,
             uf=r.uf,
             cd_municipio=r.cd_municipio,
@@ -253,6 +359,7 @@ def votos_por_zona(
 
 
 @app.get("/votos/municipio", response_model=List[VotoMunicipioOut])
+@cache_resposta
 def votos_por_municipio(
     ano: Optional[str] = Query(None),
     uf: Optional[str] = Query(None),
@@ -264,33 +371,33 @@ def votos_por_municipio(
     Votos agregados por MUNICÍPIO.
     """
     q = db.query(
-        VotoSecao.ano,
-        VotoSecao.uf,
-        VotoSecao.cd_municipio,
-        VotoSecao.nm_municipio,
-        VotoSecao.ds_cargo,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        VotoZona.ano,
+        VotoZona.uf,
+        VotoZona.cd_municipio,
+        VotoZona.nm_municipio,
+        VotoZona.ds_cargo,
+        TOTAL_VOTOS,
     )
 
     if ano:
-        q = q.filter(VotoSecao.ano == ano)
+        q = q.filter(VotoZona.ano == ano)
     if uf:
-        q = q.filter(VotoSecao.uf == uf)
+        q = q.filter(VotoZona.uf == uf)
     if ds_cargo:
-        q = q.filter(VotoSecao.ds_cargo == ds_cargo)
+        q = q.filter(VotoZona.ds_cargo == ds_cargo)
 
     q = q.group_by(
-        VotoSecao.ano,
-        VotoSecao.uf,
-        VotoSecao.cd_municipio,
-        VotoSecao.nm_municipio,
-        VotoSecao.ds_cargo,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc()).limit(limit)
+        VotoZona.ano,
+        VotoZona.uf,
+        VotoZona.cd_municipio,
+        VotoZona.nm_municipio,
+        VotoZona.ds_cargo,
+    ).order_by(func.sum(VotoZona.qt_votos).desc()).limit(limit)
 
     rows = q.all()
 
     return [
-        VotoMunicipioOut(
+        VotoMunicipioOut.model_construct(
             ano=r.ano,
             uf=r.uf,
             cd_municipio=r.cd_municipio,
@@ -303,34 +410,35 @@ def votos_por_municipio(
 
 
 @app.get("/votos/cargo", response_model=List[VotoCargoOut])
+@cache_resposta
 def votos_por_cargo(
     ano: Optional[str] = Query(None),
     uf: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
     """
-    Votos agregados por CARGO (usando diretamente votos_secao).
+    Votos agregados por CARGO (a partir de votos_zona).
     """
     q = db.query(
-        VotoSecao.ano,
-        VotoSecao.ds_cargo,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        VotoZona.ano,
+        VotoZona.ds_cargo,
+        TOTAL_VOTOS,
     )
 
     if ano:
-        q = q.filter(VotoSecao.ano == ano)
+        q = q.filter(VotoZona.ano == ano)
     if uf:
-        q = q.filter(VotoSecao.uf == uf)
+        q = q.filter(VotoZona.uf == uf)
 
     q = q.group_by(
-        VotoSecao.ano,
-        VotoSecao.ds_cargo,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc())
+        VotoZona.ano,
+        VotoZona.ds_cargo,
+    ).order_by(func.sum(VotoZona.qt_votos).desc())
 
     rows = q.all()
 
     return [
-        VotoCargoOut(
+        VotoCargoOut.model_construct(
             ano=r.ano,
             ds_cargo=r.ds_cargo,
             total_votos=r.total_votos,
@@ -344,6 +452,7 @@ def votos_por_cargo(
 # =============================
 
 @app.get("/candidatos", response_model=List[CandidatoOut])
+@cache_resposta
 def candidatos(
     ano: Optional[str] = Query(None),
     uf: Optional[str] = Query(None),
@@ -363,7 +472,7 @@ def candidatos(
     """
     Lista candidatos com total de votos.
 
-    - Votos = soma de votos_secao.qt_votos
+    - Votos = soma de votos_zona.qt_votos (votos_secao já somado por zona)
     - Metadados = candidatos_meta
     - Quando `cd_municipio` é fornecido, TODOS os candidatos daquele município
       são retornados (sem limite fixo de 100).
@@ -373,20 +482,20 @@ def candidatos(
         CandidatoMeta.uf,
         CandidatoMeta.cd_municipio,
         CandidatoMeta.nm_municipio,
-        VotoSecao.ds_cargo.label("ds_cargo"),
+        VotoZona.ds_cargo.label("ds_cargo"),
         CandidatoMeta.nr_candidato,
         CandidatoMeta.nm_candidato,
         CandidatoMeta.sg_partido,
         CandidatoMeta.ds_sit_tot_turno,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        TOTAL_VOTOS,
     ).join(
-        VotoSecao,
+        VotoZona,
         and_(
-            VotoSecao.ano == CandidatoMeta.ano,
-            VotoSecao.uf == CandidatoMeta.uf,
-            VotoSecao.cd_municipio == CandidatoMeta.cd_municipio,
-            VotoSecao.cd_cargo == CandidatoMeta.cd_cargo,
-            VotoSecao.nr_votavel == CandidatoMeta.nr_candidato,
+            VotoZona.ano == CandidatoMeta.ano,
+            VotoZona.uf == CandidatoMeta.uf,
+            VotoZona.cd_municipio == CandidatoMeta.cd_municipio,
+            VotoZona.cd_cargo == CandidatoMeta.cd_cargo,
+            VotoZona.nr_votavel == CandidatoMeta.nr_candidato,
         ),
     )
 
@@ -397,19 +506,19 @@ def candidatos(
     if cd_municipio:
         q = q.filter(CandidatoMeta.cd_municipio == cd_municipio)
     if ds_cargo:
-        q = q.filter(VotoSecao.ds_cargo == ds_cargo)
+        q = q.filter(VotoZona.ds_cargo == ds_cargo)
 
     q = q.group_by(
         CandidatoMeta.ano,
         CandidatoMeta.uf,
         CandidatoMeta.cd_municipio,
         CandidatoMeta.nm_municipio,
-        VotoSecao.ds_cargo,
+        VotoZona.ds_cargo,
         CandidatoMeta.nr_candidato,
         CandidatoMeta.nm_candidato,
         CandidatoMeta.sg_partido,
         CandidatoMeta.ds_sit_tot_turno,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc())
+    ).order_by(func.sum(VotoZona.qt_votos).desc())
 
     # Regra de paginação:
     # - Se cd_municipio foi informado, NÃO aplica limit (retorna todos os candidatos do município).
@@ -420,7 +529,7 @@ def candidatos(
     rows = q.all()
 
     return [
-        CandidatoOut(
+        CandidatoOut.model_construct(
             ano=r.ano,
             uf=r.uf,
             cd_municipio=r.cd_municipio,
@@ -437,6 +546,7 @@ def candidatos(
 
 
 @app.get("/partidos", response_model=List[PartidoOut])
+@cache_resposta
 def partidos(
     ano: Optional[str] = Query(None),
     db: Session = Depends(get_db),
@@ -447,15 +557,15 @@ def partidos(
     q = db.query(
         CandidatoMeta.sg_partido,
         CandidatoMeta.ano,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        TOTAL_VOTOS,
     ).join(
-        VotoSecao,
+        VotoZona,
         and_(
-            VotoSecao.ano == CandidatoMeta.ano,
-            VotoSecao.uf == CandidatoMeta.uf,
-            VotoSecao.cd_municipio == CandidatoMeta.cd_municipio,
-            VotoSecao.cd_cargo == CandidatoMeta.cd_cargo,
-            VotoSecao.nr_votavel == CandidatoMeta.nr_candidato,
+            VotoZona.ano == CandidatoMeta.ano,
+            VotoZona.uf == CandidatoMeta.uf,
+            VotoZona.cd_municipio == CandidatoMeta.cd_municipio,
+            VotoZona.cd_cargo == CandidatoMeta.cd_cargo,
+            VotoZona.nr_votavel == CandidatoMeta.nr_candidato,
         ),
     ).filter(CandidatoMeta.sg_partido.isnot(None))
 
@@ -465,12 +575,12 @@ def partidos(
     q = q.group_by(
         CandidatoMeta.sg_partido,
         CandidatoMeta.ano,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc())
+    ).order_by(func.sum(VotoZona.qt_votos).desc())
 
     rows = q.all()
 
     return [
-        PartidoOut(
+        PartidoOut.model_construct(
             sg_partido=r.sg_partido,
             ano=r.ano,
             total_votos=r.total_votos,
@@ -480,6 +590,7 @@ def partidos(
 
 
 @app.get("/ranking/partidos", response_model=List[RankingPartidosOut])
+@cache_resposta
 def ranking_partidos(
     ano: Optional[str] = Query(None),
     limit: int = Query(30, ge=1, le=100),
@@ -490,15 +601,15 @@ def ranking_partidos(
     """
     q = db.query(
         CandidatoMeta.sg_partido,
-        func.sum(VotoSecao.qt_votos).label("total_votos"),
+        TOTAL_VOTOS,
     ).join(
-        VotoSecao,
+        VotoZona,
         and_(
-            VotoSecao.ano == CandidatoMeta.ano,
-            VotoSecao.uf == CandidatoMeta.uf,
-            VotoSecao.cd_municipio == CandidatoMeta.cd_municipio,
-            VotoSecao.cd_cargo == CandidatoMeta.cd_cargo,
-            VotoSecao.nr_votavel == CandidatoMeta.nr_candidato,
+            VotoZona.ano == CandidatoMeta.ano,
+            VotoZona.uf == CandidatoMeta.uf,
+            VotoZona.cd_municipio == CandidatoMeta.cd_municipio,
+            VotoZona.cd_cargo == CandidatoMeta.cd_cargo,
+            VotoZona.nr_votavel == CandidatoMeta.nr_candidato,
         ),
     ).filter(CandidatoMeta.sg_partido.isnot(None))
 
@@ -507,12 +618,12 @@ def ranking_partidos(
 
     q = q.group_by(
         CandidatoMeta.sg_partido,
-    ).order_by(func.sum(VotoSecao.qt_votos).desc()).limit(limit)
+    ).order_by(func.sum(VotoZona.qt_votos).desc()).limit(limit)
 
     rows = q.all()
 
     return [
-        RankingPartidosOut(
+        RankingPartidosOut.model_construct(
             sg_partido=r.sg_partido,
             total_votos=r.total_votos,
         )
@@ -524,6 +635,27 @@ def ranking_partidos(
 # UPLOAD / RELOAD
 # =============================
 
+def _salvar_upload(file: UploadFile, dest_path: Path):
+    """Copia o upload para o volume em blocos, sem carregar o arquivo inteiro na RAM."""
+    with dest_path.open("wb", buffering=COPY_BUFFER) as f:
+        shutil.copyfileobj(file.file, f, length=COPY_BUFFER)
+
+
+def _ingerir_zip(zip_path: Path, extracted_dir: Path) -> int:
+    """Extrai o ZIP e ingere os CSVs reconhecidos (ver ingest_arquivo)."""
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        zf.extractall(extracted_dir)
+
+    total_linhas = 0
+    for path in extracted_dir.rglob("*.csv"):
+        total_linhas += ingest_arquivo(path)
+    return total_linhas
+
+
+# Os handlers de upload são async (UploadFile), então cópia, extração e
+# ingestão (I/O e CPU bloqueantes) rodam no threadpool via run_in_threadpool
+# para não travar o event loop das outras requisições.
+
 @app.post("/upload", response_model=UploadResponse)
 async def upload_csv(
     tipo: str = Query(
@@ -544,19 +676,16 @@ async def upload_csv(
         raise HTTPException(status_code=400, detail="Envie um arquivo .csv")
 
     dest_path = Path(UPLOAD_DIR) / filename
-    with dest_path.open("wb") as f:
-        content = await file.read()
-        f.write(content)
+    await run_in_threadpool(_salvar_upload, file, dest_path)
 
+    ingest = ingest_votacao_secao if tipo == "secao" else ingest_detalhe_munzona
     try:
-        if tipo == "secao":
-            linhas = ingest_votacao_secao(dest_path)
-        else:
-            linhas = ingest_detalhe_munzona(dest_path)
+        linhas = await run_in_threadpool(ingest, dest_path)
     except Exception as e:
         dest_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"Erro ao processar CSV: {str(e)}")
 
+    limpar_cache()
     return UploadResponse(
         mensagem=f"Arquivo {filename} importado com sucesso",
         linhas_importadas=linhas,
@@ -576,32 +705,22 @@ async def upload_zip(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Envie um arquivo .zip")
 
     zip_path = Path(UPLOAD_DIR) / filename
-    with zip_path.open("wb") as f:
-        content = await file.read()
-        f.write(content)
+    await run_in_threadpool(_salvar_upload, file, zip_path)
 
     extracted_dir = Path(UPLOAD_DIR) / (filename + "_unzipped")
     if extracted_dir.exists():
         shutil.rmtree(extracted_dir)
     extracted_dir.mkdir(parents=True, exist_ok=True)
 
-    total_linhas = 0
-
     try:
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(extracted_dir)
-
-        for path in extracted_dir.rglob("*.csv"):
-            name_upper = path.name.upper()
-            if "SECAO" in name_upper:
-                total_linhas += ingest_votacao_secao(path)
-            elif "MUNZONA" in name_upper:
-                total_linhas += ingest_detalhe_munzona(path)
+        total_linhas = await run_in_threadpool(_ingerir_zip, zip_path, extracted_dir)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao processar ZIP: {str(e)}")
     finally:
         zip_path.unlink(missing_ok=True)
         shutil.rmtree(extracted_dir, ignore_errors=True)
+        # Mesmo com erro, os CSVs anteriores do ZIP já foram gravados
+        limpar_cache()
 
     return UploadResponse(
         mensagem=f"ZIP {filename} importado com sucesso",
@@ -612,12 +731,15 @@ async def upload_zip(file: UploadFile = File(...)):
 @app.post("/reload", response_model=UploadResponse)
 def reload_arquivos_existentes():
     """
-    Reingere TODOS os CSVs presentes em /app/dados_tse_volume.
+    Ingere os CSVs presentes em /app/dados_tse_volume que ainda não foram
+    importados (arquivos com o mesmo conteúdo já ingerido são pulados).
     """
     try:
         total = ingest_all()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro no reload: {str(e)}")
+    finally:
+        limpar_cache()
 
     return UploadResponse(
         mensagem="Reload concluído com sucesso",
@@ -625,18 +747,35 @@ def reload_arquivos_existentes():
     )
 
 
+def _manter_ponto_de_montagem(func, path, exc_info):
+    """
+    onerror do rmtree em /clear-volume: ignora só o EBUSY ao remover o
+    próprio UPLOAD_DIR (ponto de montagem do volume); o resto sobe.
+    """
+    erro = exc_info[1]
+    if (
+        func is os.rmdir
+        and path == UPLOAD_DIR
+        and isinstance(erro, OSError)
+        and erro.errno == errno.EBUSY
+    ):
+        return
+    raise erro
+
+
 @app.post("/clear-volume")
 def clear_volume():
     """
-    Apaga arquivos do volume e limpa votos_secao + resumo_munzona.
+    Apaga arquivos do volume e limpa votos_secao + votos_zona + resumo_munzona.
     NÃO mexe em candidatos_meta.
     """
-    for path in Path(UPLOAD_DIR).glob("*"):
-        if path.is_file():
-            path.unlink()
-        else:
-            shutil.rmtree(path, ignore_errors=True)
+    # Um único rmtree do volume. Erros ao apagar sobem como 500 antes de
+    # mexer nas tabelas, exceto não conseguir remover o próprio UPLOAD_DIR
+    # quando ele é o ponto de montagem (ver _manter_ponto_de_montagem)
+    shutil.rmtree(UPLOAD_DIR, onerror=_manter_ponto_de_montagem)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
 
     clear_all_data()
+    limpar_cache()
 
     return {"mensagem": "Volume e dados de votos apagados com sucesso"}
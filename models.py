@@ -54,6 +54,43 @@ class VotoSecao(Base):
     )
 
 
+class VotoZona(Base):
+    """
+    votos_secao somado por zona + candidato (qt_votos = soma das seções).
+    Alimentada na mesma transação de cada VOTACAO_SECAO ingerido; pode ter
+    mais de uma linha por grupo (uma por chunk/arquivo), então as consultas
+    sempre fazem SUM(qt_votos) em cima dela.
+    Usada pelos endpoints de agregação no lugar de votos_secao.
+    """
+    __tablename__ = "votos_zona"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    ano = Column(String(4))
+    uf = Column(String(2))
+    cd_municipio = Column(String(10))
+    nm_municipio = Column(String(150))
+
+    nr_zona = Column(String(10))
+
+    cd_cargo = Column(String(10), nullable=True)
+    ds_cargo = Column(String(100))
+
+    nr_votavel = Column(String(20))
+    nm_votavel = Column(String(200))
+
+    sg_partido = Column(String(20), nullable=True)
+
+    qt_votos = Column(BigInteger)
+
+    __table_args__ = (
+        Index("ix_vz_ano_uf_mun_zona", "ano", "uf", "cd_municipio", "nr_zona"),
+        Index("ix_vz_meta", "ano", "uf", "cd_municipio", "cd_cargo", "nr_votavel"),
+        Index("ix_vz_ano_cargo", "ano", "ds_cargo"),
+        Index("ix_vz_partido", "ano", "sg_partido"),
+    )
+
+
 class ResumoMunZona(Base):
     """
     Tabela baseada no arquivo DETALHE_VOTACAO_MUNZONA.
@@ -133,3 +170,36 @@ class ImportLog(Base):
     nome_arquivo = Column(String(255))
     linhas_importadas = Column(BigInteger)
     criado_em = Column(DateTime, server_default=func.now())
+
+
+class ArquivoImportado(Base):
+    """
+    Conteúdo (sha256) de cada CSV já ingerido (ou visto com conteúdo repetido,
+    com linhas_importadas=0).
+    O ingest_all pula arquivos cujo hash já está aqui.
+    """
+    __tablename__ = "arquivos_importados"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    nome_arquivo = Column(String(255))
+    sha256 = Column(String(64), index=True)
+    tipo_arquivo = Column(String(20))       # 'secao' ou 'munzona'
+    linhas_importadas = Column(BigInteger)
+    criado_em = Column(DateTime, server_default=func.now())
+
+    # Caminho + tamanho + mtime do arquivo quando foi registrado: se não
+    # mudaram, o ingest_all pula o arquivo sem nem calcular o hash
+    caminho = Column(String(1024), nullable=True)
+    tamanho = Column(BigInteger, nullable=True)
+    mtime_ns = Column(BigInteger, nullable=True)
+
+
+class MarcadorCarga(Base):
+    """
+    Passos únicos de carga já concluídos na base (ex.: votos_zona montada a
+    partir de votos_secao). A linha é gravada na mesma transação do passo.
+    """
+    __tablename__ = "marcadores_carga"
+
+    nome = Column(String(64), primary_key=True)
+    criado_em = Column(DateTime, server_default=func.now())